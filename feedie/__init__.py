@@ -13,7 +13,7 @@
 #
 # Required:
 # apt-get install python3-pip libffi-dev
-# pip3 install pyopenssl feedparser irc requests sgmllib3k
+# pip3 install pyopenssl feedparser irc requests sgmllib3k lxml aiohttp
 #
 # TODO:
 # http://stackoverflow.com/a/36572948
@@ -23,9 +23,17 @@
 from irc.client import SimpleIRCClient  # type: ignore
 from jaraco.stream import buffer        # type: ignore
 from datetime import timedelta
-from queue import Queue
+from io import BytesIO
+from lxml import etree  # type: ignore
+from queue import Queue, Empty
 from typing import List
 import argparse
+import asyncio
+import atexit
+import hashlib
+import heapq
+import json
+import concurrent.futures
 import re
 import os
 import sys
@@ -39,7 +47,13 @@ import requests
 import itertools
 import threading
 import feedparser   # type: ignore
+from requests.adapters import HTTPAdapter, Retry
 from feedie.config import Config, Feed, Network
+try:
+    import aiohttp  # type: ignore
+except ImportError:
+    # without aiohttp feeds are polled by the thread scheduler instead
+    aiohttp = None
 
 
 def _termHandler(signalNumber, stackFrame):
@@ -53,30 +67,76 @@ signal.signal(signal.SIGTERM, _termHandler)
 #irc.client.ServerConnection.buffer_class = IgnoreErrorsBuffer
 
 
-class PeriodicExecutor(threading.Thread):
-    def __init__(self, interval, func, **kwargs):
-        """ Execute func(params) every 'interval' seconds """
-        threading.Thread.__init__(self, name="PeriodicExecutor")
-        self.setDaemon(1)
-        self._finished = threading.Event()
-        self._interval = interval
-        self._func = func
-        self._params = kwargs
-    
-    def setInterval(self, interval):
-        """Set the number of seconds we sleep between executing our task"""
-        self._interval = interval
-    
-    def shutdown(self):
-        """Stop this thread"""
-        self._finished.set()
-    
-    def run(self):
-        while 1:
-            if self._finished.isSet(): return
-            self._func(**self._params)
-            # sleep for interval or until shutdown
-            self._finished.wait(self._interval)
+_ATOM = '{http://www.w3.org/2005/Atom}'
+
+# user-owned location; a fixed path in /tmp would let any local user
+# plant a cache full of attacker-chosen "short" URLs
+_SHORTEN_CACHE_FILE = os.path.join(os.path.expanduser('~'),
+                                   '.cache', 'feedie', 'shorten-cache.json')
+_SHORTEN_CACHE_SIZE = 4096
+# persist after this many new entries (and at shutdown)
+_SHORTEN_CACHE_FLUSH = 32
+
+# mIRC color digits are ASCII-only, re.ASCII keeps \d on the fast path
+_STRIP_COLOR_RE = re.compile(r'\x03(?:\d{1,2},\d{1,2}|\d{1,2}|,\d{1,2}|)', re.ASCII)
+
+HEADERS = {
+    'User-Agent': "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-GB; rv:1.9.2.2) Gecko/20100316 Firefox/3.6.2",
+}
+
+# one shared session: keepalive connections survive across fetches and
+# shorten calls (Session is thread-safe for disjoint requests)
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                       max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+_SESSION.headers.update(HEADERS)
+
+
+def _feed_error(s):
+    return {'items': [{'title': s}]}
+
+def parse_feed(content):
+    """Fast RSS/Atom parse via lxml iterparse.
+
+    Extracts only what the bot actually uses (title, link, id) and
+    returns a feedparser-shaped dict, or None when nothing usable
+    was found so the caller can fall back to feedparser proper.
+    """
+    entries = []
+    try:
+        for _, elem in etree.iterparse(BytesIO(content), events=('end',),
+                                       tag=('item', _ATOM + 'entry')):
+            entry = {}
+            title = elem.findtext('title')
+            if title is None:
+                title = elem.findtext(_ATOM + 'title')
+            if title is not None:
+                entry['title'] = title.strip()
+            link = elem.findtext('link')
+            if link is None:
+                for l in elem.findall(_ATOM + 'link'):
+                    if l.get('rel') in (None, 'alternate'):
+                        link = l.get('href')
+                        break
+            if link is not None:
+                entry['link'] = link.strip()
+            guid = elem.findtext('guid')
+            if guid is None:
+                guid = elem.findtext(_ATOM + 'id')
+            if guid is not None:
+                entry['id'] = guid.strip()
+            entries.append(entry)
+            # free the subtree so memory stays bounded on huge feeds
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.XMLSyntaxError:
+        return None
+    if not entries:
+        return None
+    return {'feed': {'parser': 'lxml'}, 'entries': entries, 'items': entries}
 
 
 class _Feeds(threading.Thread):
@@ -89,71 +149,225 @@ class _Feeds(threading.Thread):
             'v.gd':         'https://v.gd/create.php?format=simple&',
             'tinyurl.com':  'http://tinyurl.com/api-create.php?',
         }
-        self.headers = {
-            'User-Agent': "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-GB; rv:1.9.2.2) Gecko/20100316 Firefox/3.6.2",
-        }
         self.service_url = None
         if config.feedie.shorten_service is not None:
             self.service_url = self.services.get(config.feedie.shorten_service)
+        # long_url -> short_url, persisted so bot restarts don't re-shorten
+        # every already-announced link
+        self._shorten_lock = threading.Lock()
+        self._shorten_cache = dict()
+        self._shorten_dirty = 0
+        try:
+            with open(_SHORTEN_CACHE_FILE, 'r') as h:
+                loaded = json.load(h)
+            if isinstance(loaded, dict):
+                self._shorten_cache = loaded
+        except (OSError, ValueError):
+            pass
+        atexit.register(self.save_shorten_cache)
         self.lastRequest = dict()
         self.cachedFeeds = dict()
+        # validators for conditional GET, so unchanged feeds cost one
+        # headers-only exchange and no parse at all
+        self.etag = dict()
+        self.modified = dict()
+        # digest of the last fetched body per feed, catches servers that
+        # do not honour conditional GET but return identical bytes
+        self.content_hash = dict()
+        # newest entry key seen per feed, lets us stop walking a feed's
+        # backlog at the first already-known entry
+        self.latest_guid = dict()
+        # every entry key ever announced per feed; membership here is the
+        # whole duplicate check, no headline canonicalization needed
+        self.seen_ids = dict()
+        # cachedFeeds/lastRequest are written from pool workers, serialize them
+        self._cache_lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=config.network.fetch_workers)
         self.feeds_num = len(self.config.feeds)
         self.init_periodic_feedRefresh()
     
     
     def run(self):
+        if aiohttp is None:
+            # thread scheduler started from init_periodic_feedRefresh
+            signal.pause()
+            return
+        asyncio.run(self.feed_loop())
         signal.pause()
-    
-    
+
+
+    async def feed_loop(self):
+        """Poll all feeds on one event loop; parse/announce runs on the pool."""
+        sem = asyncio.Semaphore(self.config.network.fetch_workers)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+            tasks = [asyncio.ensure_future(self.feed_periodic(session, sem, feed, name))
+                     for name, feed in self.config.feeds.items()
+                     if feed.enabled]
+            if tasks:
+                await asyncio.gather(*tasks)
+
+
+    async def feed_periodic(self, session, sem, feed, name):
+        while True:
+            try:
+                async with sem:
+                    await self.feed_refresh_async(session, feed, name)
+            except Exception as error:
+                # one broken feed must not cancel the other pollers via
+                # asyncio.gather and silence the bot for good
+                print('Refreshing %s failed: %r' % (name, error), flush=True)
+            await asyncio.sleep(self.feed_refresh_delay(feed))
+            feed = self.config.feeds.get(name)
+            if feed is None or not feed.enabled:
+                # dropped from the config on rehash, stop polling it
+                return
+
+
+    async def feed_refresh_async(self, session, feed, name):
+        last_seen = self.latest_guid.get(name)
+        try:
+            async with session.get(feed.url, headers=self.conditional_headers(name)) as r:
+                content = await r.read()
+                status = r.status
+                headers = r.headers
+        except asyncio.TimeoutError:
+            self.feed_announce(feed, name, _feed_error('Timeout downloading feed.'), last_seen)
+            return
+        except aiohttp.ClientError:
+            self.feed_announce(feed, name, _feed_error('Unable to download feed.'), last_seen)
+            return
+        # parsing and shorten_url are blocking, keep them off the loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, self.feed_process, feed, name,
+                                   status, content, headers, last_seen)
+
+
+    def feed_process(self, feed, name, status, content, headers, last_seen):
+        results = self.parse_response(name, status, content, headers)
+        self.feed_announce(feed, name, results, last_seen)
+
+
     def shorten_url(self, long_url: str) -> str:
         if self.service_url is None:
             return long_url
 
+        with self._shorten_lock:
+            short_url = self._shorten_cache.get(long_url)
+        if short_url is not None:
+            return short_url
+
         get_params = {'url': long_url}
         try:
-            response = requests.get(self.service_url, params=get_params, headers=self.headers)
+            response = _SESSION.get(self.service_url, params=get_params, timeout=5)
         except (requests.ConnectionError, requests.HTTPError, requests.Timeout) as error:
-            print('%s:%s' % (error.code, error.msg), flush=True)
+            print(error, flush=True)
             return long_url
             #sleep(2)
             #response = self.shorten_url(long_url)
         try: response.close()
         except: pass
+        if response.ok:
+            with self._shorten_lock:
+                self._shorten_cache[long_url] = response.text
+                # keep the cache (and its file) bounded
+                while len(self._shorten_cache) > _SHORTEN_CACHE_SIZE:
+                    del self._shorten_cache[next(iter(self._shorten_cache))]
+                self._shorten_dirty += 1
+                flush = self._shorten_dirty >= _SHORTEN_CACHE_FLUSH
+            if flush:
+                self.save_shorten_cache()
         return response.text
+
+
+    def save_shorten_cache(self):
+        # snapshot under the lock, write outside it so concurrent shortens
+        # are not serialized behind disk IO
+        with self._shorten_lock:
+            if not self._shorten_dirty:
+                return
+            snapshot = dict(self._shorten_cache)
+            self._shorten_dirty = 0
+        try:
+            os.makedirs(os.path.dirname(_SHORTEN_CACHE_FILE), exist_ok=True)
+            with open(_SHORTEN_CACHE_FILE, 'w') as h:
+                json.dump(snapshot, h)
+        except OSError:
+            pass
     
     
-    def getHeadlines(self, feed):
-        headlines = []
-        for d in feed['items']:
-            if 'title' in d:
-                title = d.get('title')
-                link = d.get('link')
-                if link:
-                    headlines.append((title, link))
-                else:
-                    headlines.append((title, None))
-        return headlines
-    
-    
+    def entry_key(self, d):
+        """Stable identity of an entry: its guid, or a digest of title+link."""
+        guid = d.get('id')
+        if guid:
+            return guid
+        raw = '%s\0%s' % (d.get('title', ''), d.get('link', ''))
+        return hashlib.blake2b(raw.encode('utf-8', 'replace'), digest_size=16).digest()
+
+
+    def conditional_headers(self, name):
+        return {
+            'If-None-Match': self.etag.get(name, ''),
+            'If-Modified-Since': self.modified.get(name, ''),
+        }
+
+
     def getFeed(self, url, name):
-        def error(s):
-            return {'items': [{'title': s}]}
         try:
             #print(f'Downloading new feed from {url}', flush=True)
-            results = feedparser.parse(url)
+            r = _SESSION.get(url, headers=self.conditional_headers(name), timeout=30)
+        except (socket.timeout, requests.Timeout):
+            return _feed_error('Timeout downloading feed.')
+        except requests.RequestException:
+            return _feed_error('Unable to download feed.')
+        return self.parse_response(name, r.status_code, r.content, r.headers)
+
+
+    def parse_response(self, name, status, content, headers):
+        """Turn a fetched response into (cached) parse results."""
+        error = _feed_error
+        if status == 304 and name in self.cachedFeeds:
+            # feed unchanged since last poll, skip parsing entirely
+            with self._cache_lock:
+                self.lastRequest[name] = time.time()
+            return self.cachedFeeds[name]
+        content_hash = hashlib.blake2b(content, digest_size=16).digest()
+        if content_hash == self.content_hash.get(name) and name in self.cachedFeeds:
+            # body is byte-identical to last poll, no need to re-parse
+            with self._cache_lock:
+                self.lastRequest[name] = time.time()
+            return self.cachedFeeds[name]
+        results = parse_feed(content)
+        if results is not None:
+            with self._cache_lock:
+                self.cachedFeeds[name] = results
+                self.lastRequest[name] = time.time()
+                self.etag[name] = headers.get('ETag', '')
+                self.modified[name] = headers.get('Last-Modified', '')
+                self.content_hash[name] = content_hash
+            self.latest_guid[name] = self.entry_key(results['entries'][0])
+            return results
+        # malformed or unusual feeds still go through feedparser
+        try:
+            results = feedparser.parse(content)
             if 'bozo_exception' in results:
                 raise results['bozo_exception']
         except sgmllib.SGMLParseError:
             return error('Invalid (unparsable) RSS feed.')
-        except socket.timeout:
-            return error('Timeout downloading feed.')
         except Exception as e:
             # These seem mostly harmless. We'll need reports of a kind that isn't.
             #print('Allowing bozo_exception "%r" through.' % e)
             pass
         if results.get('feed', {}):
-            self.cachedFeeds[name] = results
-            self.lastRequest[name] = time.time()
+            with self._cache_lock:
+                self.cachedFeeds[name] = results
+                self.lastRequest[name] = time.time()
+                self.etag[name] = headers.get('ETag', '')
+                self.modified[name] = headers.get('Last-Modified', '')
+                self.content_hash[name] = content_hash
+            entries = results.get('entries') or []
+            if entries:
+                self.latest_guid[name] = self.entry_key(entries[0])
         else:
             print('Not caching results; feed is empty.', flush=True)
         try:
@@ -162,91 +376,122 @@ class _Feeds(threading.Thread):
             # If there's a problem retrieving the feed, we should back off
             # for a little bit before retrying so that there is time for
             # the error to be resolved.
-            self.lastRequest[name] = time.time() - .5 * 180
+            with self._cache_lock:
+                self.lastRequest[name] = time.time() - .5 * 180
             return error('Unable to download feed.')
     
     
+    def feed_refresh_delay(self, feed):
+        if feed.refresh_delay is not None:
+            return feed.refresh_delay
+        return self.config.network.default_refresh_delay
+
+
     def init_periodic_feedRefresh(self):
-        self.feed_thread = dict()
-        feeds_oneTimer = []
+        self._scheduler_stop = threading.Event()
+        self.feed_thread = None
+        if aiohttp is not None:
+            # feeds are polled on the asyncio loop in run() instead
+            return
+        # one scheduler thread with a heap of due-times instead of one
+        # PeriodicExecutor thread per feed; refreshes run on the pool
+        self._due = []
+        now = time.time()
         for name, feed in self.config.feeds.items():
             if not feed.enabled:
                 continue
-            if feed.refresh_delay is not None:
-                self.feed_thread[name] = PeriodicExecutor(feed.refresh_delay, self.feed_refresh, feed=feed, name=name).start()
-            else:
-                feeds_oneTimer.append((name, feed))
-        
-        if feeds_oneTimer:
-            refresh_time = self.config.network.default_refresh_delay
-            self.feed_thread["__oneTimer__"] = PeriodicExecutor(refresh_time, self.feed_refresh_oneTimer, feeds=feeds_oneTimer).start()
-    
-    
-    def feed_refresh_oneTimer(self, feeds):
-        for name, feed in feeds:
-            self.feed_refresh(feed, name)
+            heapq.heappush(self._due, (now, name))
+        if self._due:
+            self.feed_thread = threading.Thread(target=self.feed_scheduler,
+                                                name="FeedScheduler", daemon=True)
+            self.feed_thread.start()
+
+
+    def feed_scheduler(self):
+        inflight = dict()
+        while not self._scheduler_stop.is_set():
+            if not self._due:
+                # every feed was dropped on rehash; idle until shutdown
+                self._scheduler_stop.wait(self.config.network.default_refresh_delay)
+                continue
+            due, name = self._due[0]
+            wait = due - time.time()
+            if wait > 0:
+                # a shutdown request wakes us up early
+                self._scheduler_stop.wait(wait)
+                continue
+            heapq.heappop(self._due)
+            feed = self.config.feeds.get(name)
+            if feed is None or not feed.enabled:
+                # dropped from the config on rehash, stop rescheduling it
+                continue
+            prior = inflight.get(name)
+            if prior is None or prior.done():
+                inflight[name] = self._pool.submit(self.feed_refresh, feed, name)
+            # else: the last refresh is still fetching, skip this round so
+            # two workers never race on the same feed's seen set
+            heapq.heappush(self._due, (time.time() + self.feed_refresh_delay(feed), name))
     
     
     def feed_refresh(self, feed: Feed, name: str):
+        last_seen = self.latest_guid.get(name)
+        newresults = self.getFeed(feed.url, name)
+        self.feed_announce(feed, name, newresults, last_seen)
+
+
+    def feed_announce(self, feed: Feed, name: str, newresults, last_seen):
         url = feed.url
-        try:
-            oldresults = self.cachedFeeds[name]
-            oldheadlines = self.getHeadlines(oldresults)
-        except KeyError:
-            oldheadlines = []
-        
-        if not self.config.network.startup_announces and not oldheadlines:
-            newresults = self.getFeed(url, name)
-            return
-        else:
-            newresults = self.getFeed(url, name)
-            newheadlines = self.getHeadlines(newresults)
-        
-        if len(newheadlines) == 1:
-            s = newheadlines[0][0]
+        seen = self.seen_ids.setdefault(name, set())
+        # on the very first poll just remember what is there
+        announce = bool(seen) or self.config.network.startup_announces
+
+        entries = newresults.get('entries')
+        if entries is None:
+            # error sentinel from getFeed, no real entries to look at
+            items = newresults.get('items', [])
+            s = items[0].get('title') if items else None
             if s in ('Timeout downloading feed.', 'Unable to download feed.'):
                 print('%s %u', s, url, flush=True)
-                return
-        
-        def canonize(headline):
-            return (tuple(headline[0].lower().split()), headline[1])
-        
-        oldheadlines = set(map(canonize, oldheadlines))
-        
-        for (i, headline) in enumerate(newheadlines):
-            entry_old = oldresults['entries'][i]
-            entry_new = newresults['entries'][i]
-            time_old = entry_old.get('updated_parsed', entry_new.get('published_parsed'))
-            time_new = entry_new.get('updated_parsed', entry_new.get('published_parsed'))
-            if canonize(headline) in oldheadlines and time_old >= time_new:
-                newheadlines[i] = None
-        
-        if newheadlines:
-            for i, headline in enumerate(newheadlines):
-                if headline is None:
-                    continue
-                if headline[1]:
-                    title = headline[0]
-                    link = self.shorten_url(newresults['entries'][i].get('link', 'no_url'))
-                    feedName = self.bot.mircColor(name, feed.color)
-                    feedTitle = self.bot.mircColor(title, 'blue')
-                    try:
-                        chan = feed.channel
-                    except KeyError:
-                        # send to all channels
-                        chan = None
-                    fmturl = self.bot.underline(link)
-                    wrap_url = self.config.feedie.wrap_url
-                    if wrap_url:
-                        fmturl = wrap_url[0] + fmturl + wrap_url[-1]
-                    self.on_rss_entry(chan=chan, text='{0} {1} {2}'.format(feedName, feedTitle, fmturl))
+            return
+
+        fresh = []
+        for entry in entries:
+            key = self.entry_key(entry)
+            if key == last_seen:
+                # everything from here on was already seen last poll
+                break
+            if key in seen:
+                continue
+            fresh.append((key, entry))
+
+        for key, entry in fresh:
+            seen.add(key)
+            if not announce:
+                continue
+            title = entry.get('title')
+            link = entry.get('link')
+            if title is None or not link:
+                continue
+            link = self.shorten_url(link)
+            feedName = self.bot.mircColor(name, feed.color)
+            feedTitle = self.bot.mircColor(title, 'blue')
+            try:
+                chan = feed.channel
+            except KeyError:
+                # send to all channels
+                chan = None
+            fmturl = self.bot.underline(link)
+            wrap_url = self.config.feedie.wrap_url
+            if wrap_url:
+                fmturl = wrap_url[0] + fmturl + wrap_url[-1]
+            self.on_rss_entry(chan=chan, text='{0} {1} {2}'.format(feedName, feedTitle, fmturl))
     
     
     def on_rss_entry(self, chan=None, text=''):
         if chan:
             self.bot.queue_send(text, chan)
         else:
-            for chan in {feed.channel for feed in self.config.feeds.values()}:
+            for chan in self.config.all_channels:
                 self.bot.queue_send(text, chan)
 
 
@@ -298,19 +543,66 @@ class feedie(SimpleIRCClient):
         self.msg_queue_thread = threading.Thread(target=self.msq_queue_tasks, args=(self.connection, self.msg_queue, config.network.announce_delay,))
         self.msg_queue_thread.setDaemon(1)
         self.msg_queue_thread.start()
+        # cache of the last formatted log timestamp, keyed by whole second
+        self._last_ts_sec = 0
+        self._last_ts_str = ''
+        self._owners = set(config.feedie.bot_owner)
+        self._owner_commands = {
+            'rehash':   self.cmd_rehash,
+            'restart':  self.cmd_restart,
+            'quit':     self.cmd_quit,
+        }
+        self._commands = {
+            'help':     self.cmd_help,
+            'version':  self.cmd_version,
+            'uptime':   self.cmd_uptime,
+            'feeds':    self.cmd_feeds,
+        }
         self.history_manager()
         self.init_mircColors()
     
     
+    # token bucket for outgoing privmsgs: a short burst goes out
+    # immediately, sustained rate stays at one message per announce_delay
+    MSG_BURST = 4
+    # conservative payload cap so target + command fit in a 512-byte line
+    MSG_MAX_LEN = 400
+
     def msq_queue_tasks(self, connection, queue, delay):
+        tokens = float(self.MSG_BURST)
+        last = time.monotonic()
+        pending = None
         while True:
-            (msg, target) = queue.get()
+            if pending is not None:
+                (msg, target) = pending
+                pending = None
+            else:
+                (msg, target) = queue.get()
+            # coalesce already-queued messages for the same target
+            while len(msg) < self.MSG_MAX_LEN:
+                try:
+                    nxt = queue.get_nowait()
+                except Empty:
+                    break
+                if nxt[1] == target and len(msg) + len(nxt[0]) + 3 <= self.MSG_MAX_LEN:
+                    msg = msg + ' | ' + nxt[0]
+                else:
+                    pending = nxt
+                    break
+            if delay > 0:
+                now = time.monotonic()
+                tokens = min(self.MSG_BURST, tokens + (now - last) / delay)
+                last = now
+                if tokens < 1:
+                    time.sleep(delay * (1 - tokens))
+                    last = time.monotonic()
+                    tokens = 1.0
+                tokens -= 1
             try:
                 connection.privmsg(target, msg)
             except irc.client.ServerNotConnectedError as error:
                 print("Error: %s" % error, flush=True)
                 self.jump_server()
-            time.sleep(delay)
     
     
     def queue_send(self, msg, target):
@@ -365,17 +657,19 @@ class feedie(SimpleIRCClient):
         nick = ev.source.nick
         message = ev.arguments[0]
         serv.privmsg(nick, "You said: " + message)
-        arguments = message.split(' ')
-        
-        if nick in self.config.feedie.bot_owner:
-            if '.say' == arguments[0] and len(arguments) > 2:
-                serv.privmsg(arguments[1], message.replace(arguments[0], '').replace(arguments[1], '')[2:])
-            elif '.act' == arguments[0] and len(arguments) > 2:
-                serv.action(arguments[1], message.replace(arguments[0], '').replace(arguments[1], '')[2:])
-            elif '.join' == arguments[0] and len(arguments) > 2:
-                serv.join(message[3:])
-            elif '.part' == arguments[0] and len(arguments) > 2:
-                serv.part(message[3:])
+        # one split instead of replace passes that also mangled payloads
+        # repeating the command or target words
+        parts = message.split(' ', 2)
+
+        if nick in self._owners:
+            if '.say' == parts[0] and len(parts) > 2:
+                serv.privmsg(parts[1], parts[2])
+            elif '.act' == parts[0] and len(parts) > 2:
+                serv.action(parts[1], parts[2])
+            elif '.join' == parts[0] and len(parts) > 1:
+                serv.join(parts[1])
+            elif '.part' == parts[0] and len(parts) > 1:
+                serv.part(parts[1])
     
     
     def on_pubmsg(self, serv, ev):
@@ -387,49 +681,73 @@ class feedie(SimpleIRCClient):
         message = ev.arguments[0]
         
         if self.config.network.pubmsg_log:
-            event_time = time.strftime('[%H:%M:%S]', time.localtime())
-            record = '{0} {1}@{2}: {3}'.format(event_time, nick, chan, message)
-            with open(self.irc_entries, "a") as f:
-                f.write("{}\n".format(record))
+            now = int(time.time())
+            if now != self._last_ts_sec:
+                # messages within the same second reuse the formatted stamp
+                self._last_ts_str = time.strftime('[%H:%M:%S]', time.localtime(now))
+                self._last_ts_sec = now
+            record = '{0} {1}@{2}: {3}'.format(self._last_ts_str, nick, chan, message)
+            self.log_pubmsg(record)
             print(record, flush=True)
         
-        if nick in self.config.feedie.bot_owner:
-            try:
-                if self.config.feedie.cmd_prefix + 'rehash' == message.lower():
-                    self.config.reload()
-                    serv.privmsg(chan, '{0}'.format(self.bold(self.mircColor("Successfully rehashed.", 'blue'))))
-                elif self.config.feedie.cmd_prefix + 'restart' == message.lower():
-                    #self.restart_bot(serv, ev)
-                    print("missing feature: %s" % message, flush=True)
-                elif self.config.feedie.cmd_prefix + 'quit' == message.lower():
+        prefix = self.config.feedie.cmd_prefix
+        m = message.lower()
+        if not m.startswith(prefix):
+            return
+        cmd = m[len(prefix):]
+
+        if nick in self._owners:
+            handler = self._owner_commands.get(cmd)
+            if handler is not None:
+                try:
+                    handler(serv, chan, nick)
+                except OSError as error:
                     serv.disconnect()
+                    print(error, flush=True)
                     sys.exit(1)
-            except OSError as error:
-                serv.disconnect()
-                print(error, flush=True)
-                sys.exit(1)
-
-        if self.config.feedie.cmd_prefix + 'help' == message.lower():
-            serv.privmsg(
-                chan, '{0}{1}{2}{0}{1} {3}help || '
-                      '{3}version || {3}uptime || {3}restart || {3}quit || {3}feeds'.format(
-                            self.BOLD, self.UNDERLINE, self.mircColor("Available commands:", 'blue'), self.config.feedie.cmd_prefix))
-
-        elif self.config.feedie.cmd_prefix + 'version' == message.lower():
-            serv.privmsg(chan, '{0}{1}{2}'.format(self.BOLD, self.mircColor(self.config.network.bot_name, 'blue'), self.END))
-
-        elif self.config.feedie.cmd_prefix + 'uptime' == message.lower():
-            uptime_raw = round(time.time() - self.start_time)
-            uptime = timedelta(seconds=uptime_raw)
-            serv.privmsg(chan, '{0}{1} {2} {3}'.format(self.BOLD, self.mircColor("[UPTIME]", 'teal'), uptime, self.END))
-
-        elif self.config.feedie.cmd_prefix + 'feeds' == message.lower():
-            for name, feed in self.config.feeds.items():
-                if not feed.enabled:
-                    continue
-                if not feed.channel == chan:
-                    continue
-                self.queue_send('{0}: {1}'.format(self.mircColor(name, feed.color), feed.url), chan)
+                return
+
+        handler = self._commands.get(cmd)
+        if handler is not None:
+            handler(serv, chan, nick)
+
+
+    def cmd_rehash(self, serv, chan, nick):
+        self.config.reload()
+        self._owners = set(self.config.feedie.bot_owner)
+        serv.privmsg(chan, '{0}'.format(self.bold(self.mircColor("Successfully rehashed.", 'blue'))))
+
+
+    def cmd_restart(self, serv, chan, nick):
+        #self.restart_bot(serv, ev)
+        print("missing feature: %srestart" % self.config.feedie.cmd_prefix, flush=True)
+
+
+    def cmd_quit(self, serv, chan, nick):
+        serv.disconnect()
+        sys.exit(1)
+
+
+    def cmd_help(self, serv, chan, nick):
+        serv.privmsg(
+            chan, '{0}{1}{2}{0}{1} {3}help || '
+                  '{3}version || {3}uptime || {3}restart || {3}quit || {3}feeds'.format(
+                        self.BOLD, self.UNDERLINE, self.mircColor("Available commands:", 'blue'), self.config.feedie.cmd_prefix))
+
+
+    def cmd_version(self, serv, chan, nick):
+        serv.privmsg(chan, '{0}{1}{2}'.format(self.BOLD, self.mircColor(self.config.network.bot_name, 'blue'), self.END))
+
+
+    def cmd_uptime(self, serv, chan, nick):
+        uptime_raw = round(time.time() - self.start_time)
+        uptime = timedelta(seconds=uptime_raw)
+        serv.privmsg(chan, '{0}{1} {2} {3}'.format(self.BOLD, self.mircColor("[UPTIME]", 'teal'), uptime, self.END))
+
+
+    def cmd_feeds(self, serv, chan, nick):
+        for name, feed in self.config.feeds_by_channel.get(chan, []):
+            self.queue_send('{0}: {1}'.format(self.mircColor(name, feed.color), feed.url), chan)
     
     
     def history_manager(self):
@@ -437,11 +755,30 @@ class feedie(SimpleIRCClient):
         home = '/tmp'
         self.feedie_path = os.path.dirname(os.path.realpath(__file__))
         if self.config.network.pubmsg_log:
-            if os.path.exists(home) is False:
-                os.system('mkdir {}'.format(home))
+            os.makedirs(home, exist_ok=True)
             self.irc_entries = '{}/irc-entries'.format(home)
-            if os.path.exists(self.irc_entries) is False:
-                os.system('touch {}'.format(self.irc_entries))
+            # one long-lived buffered handle instead of open/close per message
+            self._log_fh = open(self.irc_entries, 'a', buffering=8192)
+            self._log_writes = 0
+            self._log_last_flush = time.monotonic()
+            atexit.register(self.close_log)
+
+
+    def log_pubmsg(self, record):
+        self._log_fh.write(record + '\n')
+        self._log_writes += 1
+        now = time.monotonic()
+        if self._log_writes >= 64 or now - self._log_last_flush >= 5:
+            self._log_fh.flush()
+            self._log_writes = 0
+            self._log_last_flush = now
+
+
+    def close_log(self):
+        try:
+            self._log_fh.close()
+        except (OSError, ValueError):
+            pass
     
     
     def disconnect(self, msg="I'll be back!"):
@@ -471,33 +808,30 @@ class feedie(SimpleIRCClient):
     
     def stripBold(self, s):
         """Returns the string s, with bold removed."""
-        return s.replace('\x02', '')
+        return s.translate(self._stripBoldTable)
     
     
-    _stripColorRe = re.compile(r'\x03(?:\d{1,2},\d{1,2}|\d{1,2}|,\d{1,2}|)')
     def stripColor(self, s):
         """Returns the string s, with color removed."""
-        return feedie._stripColorRe.sub('', s)
+        return _STRIP_COLOR_RE.sub('', s)
     
     
     def stripReverse(self, s):
         """Returns the string s, with reverse-video removed."""
-        return s.replace('\x16', '')
+        return s.translate(self._stripReverseTable)
     
     
     def stripUnderline(self, s):
         """Returns the string s, with underlining removed."""
-        return s.replace('\x1f', '').replace('\x1F', '')
+        return s.translate(self._stripUnderlineTable)
     
     
     def stripFormatting(self, s):
         """Returns the string s, with all formatting removed."""
         # stripColor has to go first because of some strings, check the tests.
         s = self.stripColor(s)
-        s = self.stripBold(s)
-        s = self.stripReverse(s)
-        s = self.stripUnderline(s)
-        return s.replace('\x0f', '').replace('\x0F', '')
+        # one translate pass instead of chained replace calls
+        return s.translate(self._stripFormattingTable)
     
     
     def init_mircColors(self):
@@ -526,6 +860,17 @@ class feedie(SimpleIRCClient):
         self.UNDERLINE = '\x1F'
         self.SWAP = '\x16'
         self.END = '\x0F'
+        # precomputed '\x03NN' prefixes so mircColor does not zfill and
+        # format on every emitted entry
+        self._fgPrefix = {name: '\x03%02d' % int(code)
+                          for name, code in self.mircColors.items()}
+        # a fg color MUST be given when a bg color is, default to 00 (white)
+        self._bgPrefix = {name: '\x0300,%02d' % int(code)
+                          for name, code in self.mircColors.items()}
+        self._stripBoldTable = str.maketrans('', '', '\x02')
+        self._stripReverseTable = str.maketrans('', '', '\x16')
+        self._stripUnderlineTable = str.maketrans('', '', '\x1f')
+        self._stripFormattingTable = str.maketrans('', '', '\x02\x16\x1f\x0f')
     
     
     def mircColor(self, s, fg=None, bg=None):
@@ -533,14 +878,12 @@ class feedie(SimpleIRCClient):
         if fg is None and bg is None:
             return s
         elif bg is None:
-            fg = self.mircColors[str(fg)]
-            return '\x03%s%s\x03' % (fg.zfill(2), s)
+            return '%s%s\x03' % (self._fgPrefix[str(fg)], s)
         elif fg is None:
-            bg = self.mircColors[str(bg)]
             # According to the mirc color doc, a fg color MUST be specified if a
             # background color is specified.  So, we'll specify 00 (white) if the
             # user doesn't specify one.
-            return '\x0300,%s%s\x03' % (bg.zfill(2), s)
+            return '%s%s\x03' % (self._bgPrefix[str(bg)], s)
         else:
             fg = self.mircColors[str(fg)]
             bg = self.mircColors[str(bg)]
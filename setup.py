@@ -10,9 +10,11 @@ setup(name='feedie',
       license='Creative Commons License (BY-NC-SA)',
       packages=['feedie'],
       install_requires=[
+          'aiohttp',
           'pyopenssl',
           'feedparser',
           'irc',
+          'lxml',
           'requests',
           'sgmllib3k',
           'pyyaml'